@@ -3,5 +3,6 @@ pip install argostranslate
 pip install pydub
 pip install TTS
 pip install vosk
+pip install orjson
 python src/check_install.py
 apt install ffmpeg
@@ -1,2 +1,16 @@
-from .translator import Translator
-from .transcoder import FFMpeg, MediaContainer
+__all__ = ('Translator', 'FFMpeg', 'MediaContainer')
+
+
+def __getattr__(name: str):
+    """ Modules below pull argostranslate, torch and vosk models on import,
+    so they are imported only on first access
+    """
+    if name == 'Translator':
+        from .translator import Translator as value
+    elif name in ('FFMpeg', 'MediaContainer'):
+        from . import transcoder
+        value = getattr(transcoder, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
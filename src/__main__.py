@@ -1,15 +1,41 @@
 from sys import exit
 from argparse import ArgumentParser
+from functools import lru_cache
 from pathlib import Path
+from shutil import which
+from typing import Optional
 from unittest.mock import Mock
-import os
 
-from . import FFMpeg, Translator, MediaContainer
+
+LOCAL_FFMPEG = Path('bin/ffmpeg.exe')
 
 get_available_languages_tts = Mock(return_value=['en'])
 get_available_languages_stt = Mock(return_value=['ru'])
 
 
+@lru_cache(maxsize=1)
+def available_codes_stt() -> frozenset[str]:
+    return frozenset(get_available_languages_stt())
+
+
+@lru_cache(maxsize=1)
+def available_codes_tts() -> frozenset[str]:
+    return frozenset(get_available_languages_tts())
+
+
+@lru_cache(maxsize=1)
+def available_codes_subtitles() -> frozenset[str]:
+    """ Codes available for STT or translation """
+    from . import Translator
+    return available_codes_stt() | frozenset(Translator().available_codes())
+
+
+@lru_cache(maxsize=1)
+def default_ffmpeg_path() -> Optional[str]:
+    """ Searches ffmpeg in PATH, then falls back to executable in local bin folder """
+    return which('ffmpeg') or which(str(LOCAL_FFMPEG))
+
+
 def main() -> int:
     """Convert in CLI"""
     parser = ArgumentParser(description='Video translation to different langugages')
@@ -40,30 +66,44 @@ def main() -> int:
         required=True,
         help='Specify code of audio to translate'
     )
+    parser.add_argument(
+        '--ffmpeg-path',
+        dest='ffmpeg_path',
+        type=Path,
+        default=None,
+        help='Path to ffmpeg executable. By default searched in PATH, then in bin folder'
+    )
+    parser.add_argument(
+        '--temp-dir',
+        dest='temp_dir',
+        type=Path,
+        default=None,
+        help='Folder for intermediate files. Folder in RAM (like /dev/shm) speeds up processing'
+    )
     parser.add_argument(
         '--available',
         action='store_true',
         help='Print all available languages'
     )
     args = parser.parse_args()
+    # Heavy imports after parsing, so --help doesn't load models
+    from . import FFMpeg, Translator
     source: Path = args.input
     target: Path = args.output
-    subtitles: set[str] = set(args.subtitles) if args.subtitles else set()
-    audio: set[str] = set(args.audio)
+    subtitles: frozenset[str] = frozenset(args.subtitles) if args.subtitles else frozenset()
+    audio: frozenset[str] = frozenset(args.audio)
 
-    codes_stt = set(get_available_languages_stt())
-    codes_tts = set(get_available_languages_tts())
+    available_subtitles = available_codes_subtitles()
+    codes_tts = available_codes_tts()
 
-    available_subtitles = set(Translator().available_codes())  # Available for translate
-    available_subtitles = codes_stt.union(available_subtitles)  # Available for STT and translate
-    not_available_subtitles = subtitles.difference(available_subtitles)  # Not available texts
+    not_available_subtitles = subtitles - available_subtitles
     if not_available_subtitles:
-        print(f'Language {next(iter(not_available_subtitles))} are not available for subtitles')
+        print(f"Languages {', '.join(sorted(not_available_subtitles))} are not available for subtitles")
         return 1
 
-    not_available_audio = audio.difference(codes_tts)
-    if not_available_subtitles:
-        print(f'Language {next(iter(not_available_audio))} are not available for audio')
+    not_available_audio = audio - codes_tts
+    if not_available_audio:
+        print(f"Languages {', '.join(sorted(not_available_audio))} are not available for audio")
         return 2
 
     if args.available:
@@ -77,20 +117,22 @@ def main() -> int:
         print('Source file does not exist')
         return 4
 
-    if os.name == 'posix':
-        ffmpeg_path = 'ffmpeg'
+    if args.ffmpeg_path is not None:
+        ffmpeg_path = which(str(args.ffmpeg_path))
     else:
-        ffmpeg_path = Path('bin/ffmpeg.exe')
-        if not ffmpeg_path.exists():
-            print(f'FFMpeg.exe не найден в папке {ffmpeg_path.parent.absolute()}')
-            return 5
+        ffmpeg_path = default_ffmpeg_path()
+    if ffmpeg_path is None:
+        print(f'FFMpeg не найден ни в PATH, ни в папке {LOCAL_FFMPEG.parent.absolute()}')
+        return 5
 
-    with FFMpeg(ffmpeg_path) as ffmpeg:
+    with FFMpeg(ffmpeg_path, temp_parent=args.temp_dir) as ffmpeg:
         ffmpeg.run(
             source=source,
             target=target,
             audio_codes=audio,
             subtitle_codes=subtitles,
+            # Same instance, that was used to check available codes, models are already loaded
+            translator=Translator()
         )
     return 0
 
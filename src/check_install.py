@@ -1,10 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from importlib.util import find_spec
 from pathlib import Path
+import os
 
 from argostranslate import package
-from TTS.api import TTS
 
+if find_spec('hf_transfer') is not None:
+    # Parallel chunked downloads of HuggingFace files. Must be set before TTS is imported
+    os.environ.setdefault('HF_HUB_ENABLE_HF_TRANSFER', '1')
 
-def update() -> None:
+
+def update_argos() -> None:
     """
     Downloads available languages for argostranslate
     to translate from Russian to ANY available
@@ -12,41 +18,57 @@ def update() -> None:
     print('Checking ArgosTranslate packages')
     package.update_package_index()
     packages_available = package.get_available_packages()
-    packages_installed = package.get_installed_packages()
+    installed_keys = {(i.from_code, i.to_code) for i in package.get_installed_packages()}
 
-    print('Downloading ru -> Any')
+    print('Downloading ru -> Any and en -> Any for translations ru -> en -> Any')
+    to_download = []
     for language_package in packages_available:
-        if language_package.from_code != 'ru':
+        if language_package.from_code not in {'ru', 'en'}:
             continue
-        elif language_package in packages_installed:
+        elif (language_package.from_code, language_package.to_code) in installed_keys:
             print(f'\tPackage {language_package} already installed')
             continue
-        print(f'\tDownloading language pack {language_package}')
-        downloaded = language_package.download()
-        print('\tInstalling...')
-        package.install_from_path(downloaded)
+        to_download.append(language_package)
 
-    print('Downloading en -> Any for translations ru -> en -> Any')
-    for language_package in packages_available:
-        if language_package.from_code != 'en':
-            continue
-        elif language_package in packages_installed:
-            print(f'\tPackage {language_package} already installed')
-            continue
-        print(f'\tDownloading language pack {language_package}')
-        downloaded = language_package.download()
-        print('\tInstalling...')
-        package.install_from_path(downloaded)
+    # Downloads are network-bound, so they run in parallel. Installation
+    # mutates shared argostranslate state and stays sequential
+    downloaded = []
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {executor.submit(i.download): i for i in to_download}
+        for future in as_completed(futures):
+            print(f'\tDownloaded language pack {futures[future]}')
+            downloaded.append(future.result())
+    for path in downloaded:
+        print(f'\tInstalling {path.name}...')
+        package.install_from_path(path)
 
+
+def update_coqui() -> None:
+    """
+    Downloads coqui-ai TTS model
+    """
     print('Checking coqui-ai package')
     mm_path = Path('bin/cqoui.pth')
     if not mm_path.parent.exists():
-        mm_path.mkdir(parents=True)
+        mm_path.parent.mkdir(parents=True)
     if not mm_path.exists():
         mm_path.touch(exist_ok=True)
+    from TTS.api import TTS
+
     # TTS("tts_models/multilingual/multi-dataset/bark")
     TTS("tts_models/multilingual/multi-dataset/xtts_v2")
 
 
+def update() -> None:
+    """
+    Downloads all models. Downloads are independent of each other,
+    so they run concurrently and total time is bound by the longest one
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(update_argos), executor.submit(update_coqui)]
+        for future in as_completed(futures):
+            future.result()
+
+
 if __name__ == '__main__':
     update()
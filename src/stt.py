@@ -2,26 +2,50 @@
 https://github.com/GolovninLev/STT
 """
 
-import sys
 import subprocess
-from io import StringIO
-from json import loads
+from collections import deque
+from contextlib import contextmanager, suppress
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from random import choices
-from string import ascii_letters
-from typing import Generator
-import wave
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import BinaryIO, Generator, Iterable, Iterator, Optional, Union
 from vosk import Model, KaldiRecognizer, SetLogLevel
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+try:
+    import av
+except ImportError:
+    av = None
 
+from .wav import wav_header
 
-def random_string() -> str:
-    return ''.join(choices(ascii_letters, k=20))
 
+SAMPLE_RATE = 16000  # Native rate of vosk-model-small-ru, no resampling inside recognizer
+CHUNK_SIZE = 3200  # 100 ms of 16-bit mono PCM
 
-def convert_mp4_to_wav(input_file, output_file):
-    command = f"bin\\ffmpeg.exe -i {input_file} -ac 1 -acodec pcm_s16le -ar 44100 -vn {output_file}"
 
-    subprocess.run(command.split())
+def convert_mp4_to_wav(input_file, output_file, ffmpeg: Union[str, Path] = 'ffmpeg') -> None:
+    subprocess.run(
+        [
+            str(ffmpeg),
+            '-nostats',
+            '-loglevel', 'error',
+            '-i', str(input_file),
+            '-ac', '1',
+            '-acodec', 'pcm_s16le',
+            '-ar', str(SAMPLE_RATE),
+            '-vn',
+            str(output_file)
+        ],
+        check=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
 
 
 
@@ -30,6 +54,8 @@ SetLogLevel(0)
 
 
 model = Model(model_name="vosk-model-small-ru-0.22")
+_recognizers: list[KaldiRecognizer] = []
+_recognizers_lock = Lock()
 
 
 # rec.SetPartialWords(True)
@@ -47,28 +73,173 @@ model = Model(model_name="vosk-model-small-ru-0.22")
 # subprocess.run(command.split())
 
 
-def process(input: Path, temporary_folder: Path) -> Generator[dict, None, None]:
-    if input.name.endswith('.mp4'):
-        output = temporary_folder / f"{random_string()}.wav"
-        convert_mp4_to_wav((input.absolute()), str(output.absolute()))
-        wf = wave.open(str(output.absolute()), "rb")
+@contextmanager
+def get_recognizer() -> Iterator[KaldiRecognizer]:
+    """ Takes free recognizer for one file and returns it back when file is done
+    Recognizers are only reset between files. New one is created only if all
+    existing are in use, so generators consumed together never share recognizer
+    """
+    with _recognizers_lock:
+        rec = _recognizers.pop() if _recognizers else None
+    if rec is None:
+        rec = KaldiRecognizer(model, SAMPLE_RATE)
+        rec.SetWords(True)
     else:
-        wf = wave.open(str(input), 'rb')
-    rec = KaldiRecognizer(model, wf.getframerate())
-    rec.SetWords(True)
-
-    if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
-        print("Audio file must be WAV format mono PCM.")
-        sys.exit(1)
-
-    i = 0
-    while True:
-        data = wf.readframes(4000)
-        if len(data) == 0:
-            break
-        if rec.AcceptWaveform(data):
-            i += 1
-            yield loads(rec.Result())
-        else:
-            pass
-
+        rec.Reset()
+    try:
+        yield rec
+    finally:
+        with _recognizers_lock:
+            _recognizers.append(rec)
+
+
+def pcm_offset(path: Path) -> Optional[int]:
+    """ Finds beginning of samples in wav file that is already in recognizer format
+    (16-bit mono PCM with SAMPLE_RATE)
+    :param path: path to file
+    :return: offset of samples, or None if file needs to be decoded by ffmpeg
+    """
+    try:
+        header = wav_header(path)
+    except ValueError:
+        return None
+    if (header.audio_format, header.channels, header.sample_width, header.framerate) != (1, 1, 2, SAMPLE_RATE):
+        return None
+    return header.data_offset
+
+
+def stream_chunks(stream: BinaryIO) -> Iterator[bytes]:
+    return iter(partial(stream.read, CHUNK_SIZE), b'')
+
+
+def decode_av(input: Path) -> Generator[bytes, None, None]:
+    """ Decodes and resamples first audio stream in-process with PyAV,
+    without ffmpeg subprocess and intermediate float arrays
+    :param input: path to media file
+    :return: generator of 16-bit mono PCM chunks with SAMPLE_RATE
+    """
+    resampler = av.AudioResampler(format='s16', layout='mono', rate=SAMPLE_RATE)
+    with av.open(str(input.absolute())) as container:
+        for frame in chain(container.decode(audio=0), (None, )):
+            for resampled in resampler.resample(frame):
+                yield bytes(resampled.planes[0])[:resampled.samples * 2]
+
+
+def read_tail(stream: BinaryIO, tail: deque[bytes]) -> None:
+    """ Drains stream, so process never blocks on full pipe, keeping only last lines
+    :param stream: stream to read lines from
+    :param tail: deque with maxlen, receives lines
+    """
+    for line in stream:
+        tail.append(line)
+
+
+def read_chunks(
+        source: Iterable[bytes],
+        chunks: Queue[Optional[bytes]],
+        stop: Event,
+        errors: list[BaseException]
+) -> None:
+    try:
+        for data in source:
+            if stop.is_set():
+                break
+            chunks.put(data)
+    except BaseException as e:
+        # Passed to recognizing thread, otherwise error would look like end of input
+        errors.append(e)
+    finally:
+        chunks.put(None)
+        if isinstance(source, Generator):
+            source.close()
+
+
+def recognize(source: Iterable[bytes], rec: KaldiRecognizer) -> Generator[dict, None, None]:
+    """ Feeds chunks of PCM to recognizer
+    Source is read in separate thread, so I/O and decoding overlap with recognition
+    (vosk releases GIL inside AcceptWaveform)
+    :param source: chunks of 16-bit mono PCM with SAMPLE_RATE
+    :param rec: recognizer
+    :return: generator of vosk results
+    """
+    chunks: Queue[Optional[bytes]] = Queue(maxsize=32)
+    stop = Event()
+    errors: list[BaseException] = []
+    reader = Thread(
+        target=read_chunks,
+        args=(source, chunks, stop, errors),
+        name='STT reader thread',
+        daemon=True
+    )
+    reader.start()
+    try:
+        while (data := chunks.get()) is not None:
+            if rec.AcceptWaveform(data):
+                yield loads(rec.Result())
+        if errors:
+            raise errors[0]
+        # Speech at the very end of file isn't finished by silence, so it's only returned here
+        yield loads(rec.FinalResult())
+    finally:
+        # Reader can wait on full queue if generator closed early
+        stop.set()
+        while reader.is_alive():
+            with suppress(Empty):
+                chunks.get_nowait()
+            reader.join(0.01)
+
+
+def process(input: Path, ffmpeg: Union[str, Path] = 'ffmpeg') -> Generator[dict, None, None]:
+    """ Recognizes russian speech in any file ffmpeg can decode
+    Wav files already in recognizer format are read directly. Everything else
+    is decoded in-process by PyAV if it's installed, otherwise by ffmpeg with PCM
+    streamed from its stdout. No intermediate wav is written to disk
+    and recognition starts immediately
+    :param input: path to media file
+    :param ffmpeg: path to ffmpeg executable
+    :return: generator of vosk results
+    """
+    # Recognizer belongs to this generator until it's exhausted or closed
+    with get_recognizer() as rec:
+        yield from recognize_file(input, ffmpeg, rec)
+
+
+def recognize_file(input: Path, ffmpeg: Union[str, Path], rec: KaldiRecognizer) -> Generator[dict, None, None]:
+    offset = pcm_offset(input) if input.name.endswith('.wav') else None
+    if offset is not None:
+        with input.open('rb') as f:
+            f.seek(offset)
+            yield from recognize(stream_chunks(f), rec)
+        return
+
+    if av is not None:
+        yield from recognize(decode_av(input), rec)
+        return
+
+    with subprocess.Popen(
+        [
+            str(ffmpeg),
+            '-nostats',
+            '-loglevel', 'error',
+            '-i', str(input.absolute()),
+            '-ac', '1',
+            '-acodec', 'pcm_s16le',
+            '-ar', str(SAMPLE_RATE),
+            '-f', 's16le',
+            '-vn',
+            'pipe:1'
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    ) as proc:
+        tail: deque[bytes] = deque(maxlen=10)
+        stderr_reader = Thread(target=read_tail, args=(proc.stderr, tail), name='STT ffmpeg stderr thread', daemon=True)
+        stderr_reader.start()
+        yield from recognize(stream_chunks(proc.stdout), rec)
+        # Broken or unsupported input ends stdout early, same as end of file
+        return_code = proc.wait()
+        stderr_reader.join()
+        if return_code:
+            message = b''.join(tail).decode('utf-8', errors='replace').strip()
+            raise ValueError(f"FFMpeg can't decode {input.name} (exit code {return_code}): {message}")
@@ -1,80 +1,83 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Generator, Iterable, Optional, Union
+from typing import Generator, Iterable, Union
 
 
 __all__ = ('Line', 'subtitles_write')
 
 
+@dataclass(slots=True, frozen=True)
 class Line:
-    __slots__ = ('start', 'end', 'text', 'lang')
+    start: float
+    end: float
+    text: str
+    lang: str
+    # Formatted once, used both in srt output and in repr
+    _srt_start: str = field(init=False, repr=False, compare=False)
+    _srt_end: str = field(init=False, repr=False, compare=False)
 
-    def __init__(self, start: float, end: float, text: str, lang: str):
-        assert isinstance(start, (int, float))
-        assert isinstance(end, (int, float))
-        assert isinstance(text, str)
-        assert isinstance(lang, str)
-        self.start = start
-        self.end = end
-        self.text = text
-        self.lang = lang
+    def __post_init__(self):
+        object.__setattr__(self, '_srt_start', self.float_to_srt_time(self.start))
+        object.__setattr__(self, '_srt_end', self.float_to_srt_time(self.end))
 
     def __repr__(self) -> str:
         return (
             f'<Line '
-            f'from {self.float_to_srt_time(self.start)} '
-            f'to {self.float_to_srt_time(self.end)} '
+            f'from {self._srt_start} '
+            f'to {self._srt_end} '
             f'with text={self.text}>'
         )
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def float_to_srt_time(value: float) -> str:
-        microseconds = int((value % 1) * 1000)
-        seconds = int(value % 60)
-        minutes = int(value // 60)
-        hours = int(minutes // 60)
-        minutes = minutes % 60
-        return f"{hours:02.0f}:{minutes:02.0f}:{seconds:02.0f},{microseconds:03.0f}"
+        """ Cached, because translations of sentence are Lines with the same timings """
+        milliseconds = round(value * 1000)
+        seconds, milliseconds = divmod(milliseconds, 1000)
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
 
     def as_srt_line(self) -> list[str]:
         return [
-            f'{self.float_to_srt_time(self.start)} --> {self.float_to_srt_time(self.end)}',
+            f'{self._srt_start} --> {self._srt_end}',
             f'{self.text}'
         ]
 
 
-def subtitles_write(path: Union[str, Path] = 'sub.srt') -> Generator[int, Optional[Line], None]:
-    if isinstance(path, str):
-        if not path.endswith('.srt'):
-            path = path + '.str'
-        path = Path(path)
-    elif isinstance(path, Path):
-        if not path.name.endswith('.srt'):
-            path = path.parent / (path.name.split('.')[0] + '.str')
-    else:
-        assert False
+def subtitles_write(path: Union[str, Path] = 'sub.srt') -> Generator[int, Union[Line, Iterable[Line]], None]:
+    assert isinstance(path, (str, Path))
+    path = Path(path).with_suffix('.srt')
 
     counter = 1
-    with path.open(mode='w', encoding='utf-8') as f:
+    # File is read only after generator is closed, so it's written only when buffer is full
+    with path.open(mode='w', encoding='utf-8', buffering=1 << 16) as f:
         while True:
             text: Union[Iterable[Line], Line] = yield counter
             if isinstance(text, Line):
-                f.write('\n'.join([
-                    str(counter),
-                    *text.as_srt_line(),
-                    '\n'
-                ]))
-                f.flush()
-                counter += 1
-            else:
+                text = (text, )
+            elif not isinstance(text, Iterable):
                 raise TypeError(f'Awaited line, got {text}')
+            entries = []
+            for number, line in enumerate(text, start=counter):
+                if not isinstance(line, Line):
+                    raise TypeError(f'Awaited line, got {line}')
+                entries.append(f'{number}\n{line._srt_start} --> {line._srt_end}\n{line.text}\n\n')
+            # Whole batch goes to file with one write call
+            f.write(''.join(entries))
+            counter += len(entries)
 
 
 def main():
     gen = subtitles_write('subls.srt')
     next(gen)
-    gen.send(Line(20, 30, 'Привет'))
-    gen.send(Line(33, 40, 'Как твои дела?'))
-    gen.send(Line(44, 50, 'Ты крутой?'))
+    gen.send([
+        Line(20, 30, 'Привет', 'ru'),
+        Line(33, 40, 'Как твои дела?', 'ru'),
+        Line(44, 50, 'Ты крутой?', 'ru')
+    ])
+    gen.close()
 
 
 if __name__ == '__main__':
@@ -1,27 +1,50 @@
-from functools import partial
-from typing import Callable, Generator, Optional, Union
+from fractions import Fraction
+from functools import lru_cache, partial
+from typing import Any, Callable, Generator, Iterable, Optional, Union
 from pathlib import Path
-from abc import ABC
-from re import findall, finditer
-from itertools import chain
-from tempfile import TemporaryDirectory, TemporaryFile
-from subprocess import run
-from queue import Queue
-from threading import Thread
-from random import choices
-from string import ascii_letters
+from dataclasses import dataclass
+from re import compile
+from itertools import chain, count
+from tempfile import TemporaryDirectory
+from subprocess import DEVNULL, PIPE, STDOUT, run
+from queue import Empty, Queue
+from threading import Lock
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import suppress
+import wave
+import os
+from stat import S_ISREG
+from shutil import which
 
 from pydub import AudioSegment
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
 
 from .subtitles import subtitles_write, Line
 from .translator import Translator
-from .tts import tts_line
-from .stt import process as stt_process
+from .tts import speaker_latents, tts_line
+from .wav import concat_wav, wav_header
+from .stt import process as stt_process, SAMPLE_RATE as STT_SAMPLE_RATE
 
 
 __all__ = ('FFMpeg', 'MediaContainer')
 
+_STREAM_RE = compile(
+    r'Stream #0:(?P<index>\d+)(?:\[[^]]*\])?\(?(?P<language>\w+)?\)?: '
+    r'(?P<kind>Video|Audio|Subtitle): (?P<codec>\w+) ?[^,\n]*(?P<rest>[^\n]*)'
+)
+_BITRATE_RE = compile(r' (\d+) kb/s')
+_RESOLUTION_RE = compile(r'(\d+)x(\d+)')
+_FPS_RE = compile(r'(\d+\.?\d*) fps')
+_FREQUENCY_RE = compile(r' (\d+) Hz')
+TRANSLATE_BATCH = 8
+QUEUE_SIZE = 16
+INFO_CACHE_SIZE = 256
+_name_counter = count()
+
 
 def resolve_path(path: Union[str, Path]) -> Path:
     if isinstance(path, str):
@@ -29,78 +52,125 @@ def resolve_path(path: Union[str, Path]) -> Path:
     return path
 
 
-def random_string() -> str:
-    return ''.join(choices(ascii_letters, k=20))
+def require_file(path: Path) -> os.stat_result:
+    """ Checks that path is existing file with single stat call
+    :param path: path to check
+    :return: stat of file
+    :raises ValueError: path doesn't exist or it's not a file
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        raise ValueError('Path is not correct') from None
+    if not S_ISREG(stat.st_mode):
+        raise ValueError('Path target is not a files')
+    return stat
 
 
-class _DataType(ABC):
-    __slots__ = ('index', 'codec', 'language', 'source')
+def random_string() -> str:
+    """ Unique name for temporary files. Counter is enough, because all of them
+    are placed in temporary directory of this process
+    """
+    return f"t{next(_name_counter):016x}"
+
+
+def queue_batches(queue: Queue, size: int) -> Generator[list, None, None]:
+    """ Yields lists of queue items until None is received
+    First item of each batch is awaited, others are taken only if they are
+    already in queue, so batching never waits for more items
+    :param queue: queue, terminated by None
+    :param size: maximum size of batch
+    :return: generator of non-empty lists
+    """
+    finished = False
+    while not finished and (item := queue.get()) is not None:
+        batch = [item]
+        while len(batch) < size:
+            try:
+                item = queue.get_nowait()
+            except Empty:
+                break
+            if item is None:
+                finished = True
+                break
+            batch.append(item)
+        yield batch
+        for _ in batch:
+            queue.task_done()
+
+
+def pipeline_stage(
+        target: Callable[..., None],
+        /,
+        producer: Optional[Future] = None,
+        inputs: tuple[Queue, ...] = (),
+        output: Optional[Queue] = None,
+        **kwargs
+) -> None:
+    """ Runs one stage of pipeline, connected to others by bounded queues
+    Stage always sends None to output queue, so next stage finishes even if this one failed.
+    On failure items from inputs are taken away until producer is finished,
+    otherwise producer would wait forever on full queue
+    :param target: function of stage, called with kwargs
+    :param producer: future of previous stage
+    :param inputs: queues filled by previous stage
+    :param output: queue terminated by None after stage is finished
+    """
+    try:
+        target(**kwargs)
+    except BaseException:
+        while producer is not None and not producer.done():
+            for queue in inputs:
+                with suppress(Empty):
+                    queue.get(timeout=0.05)
+        raise
+    finally:
+        if output is not None:
+            output.put(None)
+
+
+def translate_lines(translator: Translator, lines: list[Line], codes: Iterable[str]) -> list[list[Line]]:
+    """ Translates batch of lines to every code
+    :return: for every line list of its translations
+    """
+    translations = translator.translate_many([line.text for line in lines], codes)
+    return [
+        [
+            Line(start=line.start, end=line.end, text=texts[i], lang=code)
+            for code, texts in translations.items()
+        ]
+        for i, line in enumerate(lines)
+    ]
 
-    def __init__(self, index: int, codec: str, language: str, source: Path, skip_validators: bool = False):
-        if not skip_validators:
-            assert isinstance(index, int)
-            assert isinstance(codec, str)
-            assert isinstance(language, str)
-            assert isinstance(source, Path)
-        self.index = index
-        self.codec = codec
-        self.language = language
-        self.source = source
 
+@dataclass(slots=True, frozen=True)
+class _DataType:
+    index: Optional[int]
+    codec: Optional[str]
+    language: Optional[str]
+    source: Path
 
-class Video(_DataType):
-    __slots__ = ('resolution', 'bitrate', 'fps')
 
-    def __init__(
-            self,
-            index: int,
-            codec: str,
-            language: str,
-            bitrate: Optional[float],
-            source: Union[str, Path],
-            resolution: tuple[int, int],
-            fps: float,
-            skip_validators: bool = False
-    ):
-        super().__init__(index, codec, language, source, skip_validators=skip_validators)
-        if not skip_validators:
-            assert isinstance(bitrate, float) or bitrate is None
-            assert isinstance(resolution, tuple)
-            assert isinstance(resolution[0], int)
-            assert isinstance(resolution[1], int)
-            assert isinstance(fps, float)
-        self.bitrate = bitrate
-        self.resolution = resolution
-        self.fps = fps
+@dataclass(slots=True, frozen=True)
+class Video(_DataType):
+    bitrate: Optional[float]
+    resolution: tuple[int, int]
+    fps: Optional[float]
 
     def __repr__(self) -> str:
         return f"<Video layer codec={self.codec} fps={self.fps}>"
 
 
+@dataclass(slots=True, frozen=True)
 class Audio(_DataType):
-    __slots__ = ('frequency', 'bitrate')
-
-    def __init__(
-            self,
-            index: int,
-            codec: str,
-            language: str,
-            bitrate: Optional[float],
-            source: Union[str, Path],
-            frequency: int,
-            skip_validators: bool = False
-    ):
-        super().__init__(index, codec, language, source, skip_validators=skip_validators)
-        if not skip_validators:
-            assert isinstance(bitrate, float) or bitrate is None
-            assert isinstance(frequency, int)
-        self.bitrate = bitrate
-        self.frequency = frequency
+    bitrate: Optional[float]
+    frequency: Optional[int]
 
     def __repr__(self) -> str:
         return f"<Audio layer codec={self.codec} frequency={self.frequency}>"
 
 
+@dataclass(slots=True, frozen=True)
 class Subtitles(_DataType):
     def __repr__(self) -> str:
         return f"<Subtitles layer codec={self.codec} language={self.language}>"
@@ -111,21 +181,21 @@ def info_parse(
         source: Union[str, Path]
 ) -> tuple[list[Video], list[Audio], list[Subtitles]]:
     output = ([], [], [])
-    pattern = r'Stream #0:(\d)(\[[^]]*\])?\(?(\w+)?\)?: (Video|Audio|Subtitle): (\w+) ?[^,\n]*([^\n]*)'
-    # : (Video|Audio|Subtitle): (\w+) ?[^,\n]*([^\n]*)
-    for line in findall(pattern, info):
-        language = line[2]
-        codec = line[4]
-        index = int(line[0])
-        try:
-            bitrate = float(next(finditer(r' (\d+) kb/s', line[5])).group(1))
-        except StopIteration:
-            bitrate = None
-        if line[3] == 'Video':
-            resolution = next(finditer(r'(\d+)x(\d+)', line[5]))
-            resolution = resolution.groups()
-            resolution = (int(resolution[0]), int(resolution[1]))
-            fps = float(next(finditer(r'(\d+.?\d+) fps', line[5])).group(1))
+    for match in _STREAM_RE.finditer(info):
+        kind = match['kind']
+        rest = match['rest']
+        language = match['language'] or ''
+        codec = match['codec']
+        index = int(match['index'])
+        # Optional values are searched only if their unit is in line: substring check
+        # is much cheaper than failed regex search
+        bitrate = _BITRATE_RE.search(rest) if ' kb/s' in rest else None
+        bitrate = None if bitrate is None else float(bitrate.group(1))
+        if kind == 'Video':
+            resolution = _RESOLUTION_RE.search(rest)
+            resolution = (int(resolution.group(1)), int(resolution.group(2)))
+            fps = _FPS_RE.search(rest) if ' fps' in rest else None
+            fps = None if fps is None else float(fps.group(1))
             output[0].append(Video(
                 index=index,
                 codec=codec,
@@ -135,8 +205,9 @@ def info_parse(
                 resolution=resolution,
                 fps=fps
             ))
-        elif line[3] == 'Audio':
-            frequency = int(next(finditer(r' (\d+) Hz', line[5])).group(1))
+        elif kind == 'Audio':
+            frequency = _FREQUENCY_RE.search(rest) if ' Hz' in rest else None
+            frequency = None if frequency is None else int(frequency.group(1))
             output[1].append(Audio(
                 index=index,
                 codec=codec,
@@ -145,19 +216,122 @@ def info_parse(
                 bitrate=bitrate,
                 frequency=frequency
             ))
-        elif line[3] == 'Subtitle':
+        else:
             output[2].append(Subtitles(
                 index=index,
-                codec=line[4],
-                language=line[2],
+                codec=codec,
+                language=language,
                 source=source
             ))
-        else:
-            print(line)
-            raise RuntimeError()
     return output
 
 
+def probe_parse(
+        probe: dict,
+        source: Union[str, Path]
+) -> tuple[list[Video], list[Audio], list[Subtitles]]:
+    """ Same as info_parse, but reads structured output of
+    `ffprobe -print_format json -show_streams`
+    """
+    output = ([], [], [])
+    for stream in probe.get('streams', ()):
+        codec_type = stream.get('codec_type')
+        index = int(stream['index'])
+        codec = stream.get('codec_name', '')
+        tags = stream.get('tags', {})
+        language = tags.get('language', '')
+        # Matroska keeps stream bitrate only in statistics tags
+        bitrate = stream.get('bit_rate', tags.get('BPS'))
+        bitrate = None if bitrate is None else int(bitrate) / 1000
+        if codec_type == 'video':
+            width, height = stream.get('width'), stream.get('height')
+            # Broken streams have no frame size, they can't be used as video anyway
+            if width is None or height is None:
+                continue
+            fps = stream.get('avg_frame_rate', '0/0')
+            if fps.endswith('/0'):
+                fps = stream.get('r_frame_rate', '0/0')
+            # Cover art and attached pictures have no frame rate at all: 0/0.
+            # Rounded to the same precision as ffmpeg -i output
+            fps = None if fps.endswith('/0') else round(float(Fraction(fps)), 2)
+            output[0].append(Video(
+                index=index,
+                codec=codec,
+                language=language,
+                source=source,
+                bitrate=bitrate,
+                resolution=(int(width), int(height)),
+                fps=fps
+            ))
+        elif codec_type == 'audio':
+            frequency = stream.get('sample_rate')
+            output[1].append(Audio(
+                index=index,
+                codec=codec,
+                language=language,
+                source=source,
+                bitrate=bitrate,
+                frequency=None if frequency is None else int(frequency)
+            ))
+        elif codec_type == 'subtitle':
+            output[2].append(Subtitles(
+                index=index,
+                codec=codec,
+                language=language,
+                source=source
+            ))
+    return output
+
+
+@lru_cache(maxsize=16)
+def check_ffmpeg(path_ffmpeg: str) -> None:
+    """ Validates ffmpeg executable by its version output.
+    Cached, so instances with the same executable don't start ffmpeg again
+    :param path_ffmpeg: path to ffmpeg executable
+    :raises ValueError: executable is not ffmpeg
+    """
+    value = run(
+        [path_ffmpeg, '-version'],
+        stdin=DEVNULL,
+        stdout=PIPE,
+        stderr=STDOUT,
+        encoding='utf-8',
+        errors='replace'
+    ).stdout
+    first_line = value.partition('\n')[0]
+    # Explicit checks instead of asserts, so executable is validated under python -O too
+    if 'the FFmpeg developers' not in first_line:
+        raise ValueError('FFMpeg is not correct: wrong output from FFMpeg')
+    if not first_line.startswith('ffmpeg'):
+        raise ValueError('FFMpeg is not correct: wrong FFMpeg executable')
+    if 'libavformat' not in value:
+        raise ValueError("FFMpeg is not correct: can't find libavformat")
+    if 'libavcodec' not in value:
+        raise ValueError("FFMpeg is not correct: can't find libavcodec")
+
+
+@lru_cache(maxsize=16)
+def find_ffprobe(path_ffmpeg: str) -> Optional[str]:
+    """ Looks for ffprobe next to ffmpeg executable (or in PATH, if ffmpeg is called by name)
+    :return: path to ffprobe or None if it can't be found
+    """
+    path = Path(path_ffmpeg)
+    return which(str(path.with_name(path.name.replace('ffmpeg', 'ffprobe'))))
+
+
+@lru_cache(maxsize=16)
+def check_ffprobe(path_ffprobe: str) -> str:
+    """ Validates explicitly given ffprobe executable
+    :param path_ffprobe: path to ffprobe executable or its name in PATH
+    :return: resolved path to ffprobe
+    :raises ValueError: ffprobe can't be found or isn't executable
+    """
+    path = which(path_ffprobe)
+    if path is None:
+        raise ValueError(f"FFProbe is not correct: can't find executable {path_ffprobe}")
+    return path
+
+
 class MediaContainer:
     __slots__ = ('objects', )
 
@@ -181,47 +355,109 @@ class MediaContainer:
 
 
 class FFMpeg:
-    __slots__ = ('ffmpeg', '_tempDirectory', '_tempDirectory_path')
+    __slots__ = (
+        'ffmpeg', 'ffprobe', '_pool',
+        '_temp_parent', '_tempDirectory', '_tempDirectory_path'
+    )
+    # Shared by all instances, so repeated analysis with new instance doesn't probe files again
+    _info_cache: OrderedDict[
+        tuple[str, int, int, str],
+        tuple[list[Video], list[Audio], list[Subtitles]]
+    ] = OrderedDict()
+    _info_lock = Lock()
 
     def __init__(
         self,
-        path_ffmpeg: Union[str, Path]
+        path_ffmpeg: Union[str, Path],
+        temp_parent: Optional[Union[str, Path]] = None,
+        path_ffprobe: Optional[Union[str, Path]] = None
     ):
+        """
+        :param path_ffmpeg: path to ffmpeg executable
+        :param temp_parent: folder to create temporary directory in, system one if None.
+            All intermediate audio is written there, so folder in RAM (like /dev/shm) saves disk I/O
+        :param path_ffprobe: path to ffprobe executable. By default it's searched next to ffmpeg.
+            Without ffprobe streams are parsed from ffmpeg output
+        """
         self.ffmpeg = path_ffmpeg
-        value = self._call_ffmpeg('-version')
-        values = value.split('\n')
-        try:
-            assert 'the FFmpeg developers' in values[0], 'Wrong output from FFMpeg'
-            assert values[0].startswith('ffmpeg'), 'Wrong FFMpeg executable'
-            assert 'libavformat' in value, "Can't find libavformat"
-            assert 'libavcodec' in value, "Can't find libavcodec"
-        except AssertionError as e:
-            raise ValueError('FFMpeg is not correct') from e
+        self._temp_parent = temp_parent
+        check_ffmpeg(str(path_ffmpeg))
+        # Explicit ffprobe is only validated, search next to ffmpeg is skipped
+        if path_ffprobe is None:
+            self.ffprobe = find_ffprobe(str(path_ffmpeg))
+        else:
+            self.ffprobe = check_ffprobe(str(path_ffprobe))
 
     def __enter__(self):
-        self._tempDirectory = TemporaryDirectory()
+        self._tempDirectory = TemporaryDirectory(dir=self._temp_parent)
         self._tempDirectory_path = Path(self._tempDirectory.name)
+        # Shared workers for independent ffmpeg/ffprobe calls. Each call is separate process,
+        # so threads are enough to run them in parallel
+        self._pool = ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            thread_name_prefix='FFMpeg worker'
+        )
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self._pool.shutdown()
+        self._pool = None
         self._tempDirectory.cleanup()
         self._tempDirectory = None
         self._tempDirectory_path = None
 
-    def _call_ffmpeg(self, parameters: str) -> str:
+    def map(self, function: Callable[[Any], Any], values: Iterable[Any]) -> list[Any]:
+        """ Calls function for every value on shared workers of this instance.
+        Useful for processing folder of files with extract_audio, aac_to_wav, wav_to_aac, etc:
+        several ffmpeg processes run at once, but not more than workers count
+        :param function: function to call, usually method of this instance
+        :param values: arguments of function
+        :return: results in the same order as values
+        """
+        return list(self._pool.map(function, values))
+
+    def _call_ffmpeg(self, *parameters: Union[str, Path, int, float], check: bool = False) -> str:
         """ Low-level function to make calls to FFMpeg
-        :param parameters: parameters passed to ffmpeg executable. "ffmpeg " already placed
+        Executable is called directly with argument list, without shell,
+        and output is captured through pipe. Banner and progress
+        statistics are disabled, so only useful output goes through it
+        :param parameters: arguments passed to ffmpeg executable, each as separate value.
+            Executable itself already placed
+        :param check: Raise ValueError with end of output if ffmpeg failed
+        :return: combined stdout and stderr of ffmpeg
         """
-        with TemporaryFile(mode='r+') as f:
-            run(
-                f"{self.ffmpeg} {parameters}",
-                stdout=f,
-                stderr=f,
-                stdin=f,
-                shell=True
-            )
-            f.seek(0)
-            return f.read()
+        result = run(
+            [str(self.ffmpeg), '-hide_banner', '-nostats', *map(str, parameters)],
+            stdin=DEVNULL,
+            stdout=PIPE,
+            stderr=STDOUT,
+            encoding='utf-8',
+            errors='replace'
+        )
+        if check and result.returncode:
+            tail = '\n'.join(result.stdout.splitlines()[-10:])
+            raise ValueError(f'FFMpeg failed with exit code {result.returncode}: {tail}')
+        return result.stdout
+
+    def _call_ffprobe(self, path: Path) -> dict:
+        """ Low-level function to get information about streams of file
+        :param path: path to file
+        :return: parsed json output of ffprobe
+        """
+        return loads(run(
+            [
+                self.ffprobe,
+                '-v', 'error',
+                '-print_format', 'json',
+                '-show_streams',
+                str(path)
+            ],
+            stdin=DEVNULL,
+            stdout=PIPE,
+            stderr=DEVNULL,
+            encoding='utf-8',
+            errors='replace'
+        ).stdout or '{}')
 
     def build_mc(self, path: Union[str, Path], mc: MediaContainer, overwrite_ok: bool = False) -> None:
         """ Bulds MediaContainer to target path
@@ -232,40 +468,38 @@ class FFMpeg:
         """
         assert isinstance(mc, MediaContainer)
         assert isinstance(overwrite_ok, bool)
-        path = resolve_path(path)
+        # Absolute once, everything below uses this path
+        path = resolve_path(path).absolute()
         path.parent.mkdir(parents=True, exist_ok=True)
         if path.exists():
             if overwrite_ok:
                 path.unlink()
             else:
                 raise ValueError('Trying to overwrite file')
-        inputs_l = list()
+        inputs: dict[Path, int] = dict()
         maps = list()
+        metadata = list()
         no_subtitles = True if path.name.endswith('.mp4') else False
         for object in mc.objects:
             if isinstance(object, Subtitles) and no_subtitles:
                 continue
-            try:
-                input_index = inputs_l.index(object.source)
-            except ValueError:
-                inputs_l.append(object.source)
-                input_index = len(inputs_l)-1
-            maps.append(f"-map {input_index}:{object.index}")
-        print(
-            ' '.join([
-                *[f'-i "{i.absolute()}"' for i in inputs_l],
-                # *maps TODO:
-            ]) + ' ' +
-            ' -c copy -shortest ' +
-            '"' + str(path.absolute()) + '"')
-        self._call_ffmpeg(
-            ' '.join([
-                *[f'-i "{i.absolute()}"' for i in inputs_l],
-                # *maps TODO:
-            ]) + ' ' +
-            ' -c copy -shortest ' +
-            '"' + str(path.absolute()) + '"'
-        )
+            # Same file given as str or relative path is still read only once
+            input_index = inputs.setdefault(Path(object.source).absolute(), len(inputs))
+            stream_index = 0 if object.index is None else object.index
+            if object.language:
+                metadata.extend((f'-metadata:s:{len(maps) // 2}', f'language={object.language}'))
+            maps.extend(('-map', f'{input_index}:{stream_index}'))
+        # All streams are muxed in one invocation, so every input is read once
+        parameters = [
+            *chain.from_iterable(('-i', i) for i in inputs),
+            *maps,
+            *metadata,
+            '-c', 'copy',
+            '-shortest',
+            path
+        ]
+        print(parameters)
+        self._call_ffmpeg(*parameters)
 
     def get_info(
             self,
@@ -275,18 +509,31 @@ class FFMpeg:
         """ Analyzes target media/video/audio container.
         Returns tuple of lists of different media type. Each can be empty, but not None
         :param path: path to container. Extension doesn't matter
-        :param skip_validators: Assume everything valid and create all classes without validators. Use this only for 
+        :param skip_validators: Assume path is valid and skip its checks. Use this only for
             gathering files to instatly build it into MediaContainer.
         :return: list of Videos, list of Audio and list of Subtitles
         """
-        if skip_validators:
-            info_parse(self._call_ffmpeg(f'-i "{path}"'), source=path)
         path = resolve_path(path)
-        if not path.exists():
-            raise ValueError('Path is not correct')
-        if not path.is_file():
-            raise ValueError('Path target is not a files')
-        return info_parse(self._call_ffmpeg(f'-i "{path}"'), source=path)
+        # Repeated probes of unchanged file are answered from cache
+        stat = path.stat() if skip_validators else require_file(path)
+        # Executables parse streams differently, so result depends on which one probed file
+        key = (str(path.absolute()), stat.st_mtime_ns, stat.st_size, self.ffprobe or str(self.ffmpeg))
+        with self._info_lock:
+            info = self._info_cache.get(key)
+            if info is not None:
+                self._info_cache.move_to_end(key)
+        if info is None:
+            if self.ffprobe is not None:
+                info = probe_parse(self._call_ffprobe(path), source=path)
+            else:
+                info = info_parse(self._call_ffmpeg('-i', path), source=path)
+            # Least recently used results are dropped, so cache doesn't grow with every probed file
+            with self._info_lock:
+                self._info_cache[key] = info
+                if len(self._info_cache) > INFO_CACHE_SIZE:
+                    self._info_cache.popitem(last=False)
+        # Copies, so callers can't change cached lists
+        return list(info[0]), list(info[1]), list(info[2])
 
     def analyze_folders(
             self,
@@ -305,39 +552,45 @@ class FFMpeg:
         :return: dictionary with keys as strings and sets of different values as value
         """
         path = resolve_path(path)
-        output: dict[str, set[Union[float, int, str, tuple[int, int]]]] = dict()
-
-        output['video_fps'] = set()
-        output['vido_codec'] = set()
-        output['video_resolution'] = set()
-        output['video_bitrate'] = set()
-        output['video_language'] = set()
-        output['audio_codec'] = set()
-        output['audio_language'] = set()
-        output['audio_bitrate'] = set()
-        output['audio_frequency'] = set()
-
-        for i in Path(path).iterdir():
-            info = self.get_info(i)
-            output['video_fps'].add(info[0][0].fps)
-            output['vido_codec'].add(info[0][0].codec)
-            output['video_resolution'].add(info[0][0].resolution)
-            output['video_bitrate'].add(info[0][0].bitrate)
-            output['video_language'].add(info[0][0].language)
-            output['audio_codec'].add(info[1][0].codec)
-            output['audio_language'].add(info[1][0].language)
-            output['audio_bitrate'].add(info[1][0].bitrate)
-            output['audio_frequency'].add(info[1][0].frequency)
+        # Type of entry is known from directory listing, so it costs no extra stat
+        with os.scandir(path) as entries:
+            files = [Path(entry.path) for entry in entries if entry.is_file()]
+        # Probes are separate processes, so they run in parallel on shared workers.
+        # Files are just listed, so validators can be skipped
+        videos: list[Video] = []
+        audios: list[Audio] = []
+        for info in self.map(partial(self.get_info, skip_validators=True), files):
+            # Files without streams (not media) are ignored
+            if info[0]:
+                videos.append(info[0][0])
+            if info[1]:
+                audios.append(info[1][0])
+
+        # Each value is gathered as column over all files and deduplicated once
+        output: dict[str, set[Union[float, int, str, tuple[int, int]]]] = {
+            'video_fps': {i.fps for i in videos},
+            'video_codec': {i.codec for i in videos},
+            'video_resolution': {i.resolution for i in videos},
+            'video_bitrate': {i.bitrate for i in videos},
+            'video_language': {i.language for i in videos},
+            'audio_codec': {i.codec for i in audios},
+            'audio_language': {i.language for i in audios},
+            'audio_bitrate': {i.bitrate for i in audios},
+            'audio_frequency': {i.frequency for i in audios},
+        }
 
         values = [
-            'Video fps: ' + ', '.join((str(i) for i in output['video_fps'])),
-            'Video codec: ' + ', '.join((str(i) for i in output['vido_codec'])),
-            'Video resolution: ' + ', '.join((str(i) for i in output['video_resolution'])),
-            'Video bitrate: ' + ', '.join((str(i) for i in output['video_bitrate'])),
-            'Audio language: ' + ', '.join((str(i) for i in output['audio_language'])),
-            'Audio codec: ' + ', '.join((str(i) for i in output['audio_codec'])),
-            'Audio bitrate: ' + ', '.join((str(i) for i in output['audio_bitrate'])),
-            'Audio frequency: ' + ', '.join((str(i) for i in output['audio_frequency']))
+            f"{title}: {', '.join(map(str, output[key]))}"
+            for title, key in (
+                ('Video fps', 'video_fps'),
+                ('Video codec', 'video_codec'),
+                ('Video resolution', 'video_resolution'),
+                ('Video bitrate', 'video_bitrate'),
+                ('Audio language', 'audio_language'),
+                ('Audio codec', 'audio_codec'),
+                ('Audio bitrate', 'audio_bitrate'),
+                ('Audio frequency', 'audio_frequency')
+            )
         ]
 
         if to_path is not None:
@@ -350,27 +603,38 @@ class FFMpeg:
         else:
             return output
 
-    def extract_audio(self, video_source: Union[str, Path]) -> Audio:
+    def extract_audio(
+            self,
+            video_source: Union[str, Path],
+            info: Optional[tuple[list[Video], list[Audio], list[Subtitles]]] = None
+    ) -> Audio:
         """ Extracts aac audio from file to destination
         :param video_source: Path to source video (.mp4 or .mkv)
+        :param info: Result of get_info for video_source, if caller already has it
         :return: Path to extracted audio
         """
         video_source = resolve_path(video_source)
-        if not video_source.exists():
-            raise ValueError('Path is not correct')
-        if not video_source.is_file():
-            raise ValueError('Path target is not a files')
+        require_file(video_source)
         if not (video_source.name.endswith('.mkv') or video_source.name.endswith('.mp4')):
             raise TypeError(f"Undefined type of file {video_source.name}")
 
         # Get info about video file
-        info = self.get_info(video_source)
+        if info is None:
+            info = self.get_info(video_source)
         assert info[1][0].codec == 'aac', 'Only aac codecs are enabled'
 
         # Extract aac
-        target_aac = self._tempDirectory_path / f"{video_source.name.split('.')[0]}.aac"
-        self._call_ffmpeg(f'-i "{video_source}" -vn -acodec copy "{target_aac}"')
-        return self.get_info(target_aac)[1][0]
+        target_aac = self._tempDirectory_path / f"{random_string()}.aac"
+        self._call_ffmpeg('-i', video_source, '-vn', '-acodec', 'copy', target_aac)
+        # Stream is copied as is, so it has the same parameters as in source
+        return Audio(
+            index=0,
+            codec=info[1][0].codec,
+            language=info[1][0].language,
+            bitrate=info[1][0].bitrate,
+            source=target_aac,
+            frequency=info[1][0].frequency
+        )
 
     def aac_to_wav(self, audio_source: Union[str, Path]) -> Audio:
         """ Converts aac to wav format and saves it into temporary directory
@@ -378,37 +642,37 @@ class FFMpeg:
         :return: Audio with all necessary information
         """
         audio_source = resolve_path(audio_source)
-        if not audio_source.exists():
-            raise ValueError('Path is not correct')
-        if not audio_source.is_file():
-            raise ValueError('Path target is not a files')
+        require_file(audio_source)
 
         # Transcode to wav
-        target_wav = self._tempDirectory_path / f"{audio_source.name.split('.')[0]}.wav"
-        self._call_ffmpeg(f'-i "{audio_source}" -f s16le -acodec pcm_s16le "{target_wav}"')
+        target_wav = self._tempDirectory_path / f"{random_string()}.wav"
+        self._call_ffmpeg('-i', audio_source, '-acodec', 'pcm_s16le', target_wav)
 
         return Audio(
-            index=None,
-            codec=None,
+            index=0,
+            codec='pcm_s16le',
             language=None,
             bitrate=None,
-            source=audio_source,
-            frequency=None,
-            skip_validators=True
+            source=target_wav,
+            frequency=None
         )
 
     def wav_to_aac(self, audio_source: Union[str, Path]) -> Audio:
         audio_source = resolve_path(audio_source)
-        if not audio_source.exists():
-            raise ValueError('Path is not correct')
-        if not audio_source.is_file():
-            raise ValueError('Path target is not a files')
-
-        # Transcode to wav
-        target_aac = self._tempDirectory_path / f"{audio_source.name.split('.')[0]}.aac"
-        self._call_ffmpeg(f'-i "{audio_source}" "{target_aac}"')
+        require_file(audio_source)
 
-        return self.get_info(target_aac)[1][0]
+        # Transcode to aac
+        target_aac = self._tempDirectory_path / f"{random_string()}.aac"
+        self._call_ffmpeg('-i', audio_source, target_aac)
+        # Encoder keeps sample rate of wav, so there is nothing to probe
+        return Audio(
+            index=0,
+            codec='aac',
+            language=None,
+            bitrate=None,
+            source=target_aac,
+            frequency=wav_header(audio_source).framerate
+        )
 
     def get_wav(
             self,
@@ -416,14 +680,58 @@ class FFMpeg:
     ) -> Audio:
         video_source = resolve_path(video_source)
 
-        if not video_source.exists():
-            raise ValueError('Path is not correct')
-        if not video_source.is_file():
-            raise ValueError('Path target is not a files')
+        require_file(video_source)
+
+        return self.video_to_wav(video_source)
 
-        aac_file: Audio = self.extract_audio(video_source)
-        wav_file: Audio = self.aac_to_wav(aac_file.source)
-        return self.get_info(wav_file.source)[1][0]
+    def video_to_wav(
+            self,
+            video_source: Union[Path, str],
+            sample_rate: Optional[int] = None,
+            channels: Optional[int] = None
+    ) -> Audio:
+        """ Decodes first audio stream of video straight to wav with one ffmpeg call,
+        without intermediate aac file
+        :param video_source: Path to source video
+        :param sample_rate: Resample audio to this rate. Original rate is kept if None
+        :param channels: Mix audio to this amount of channels. Original layout is kept if None
+        :return: Audio with path to wav in temporary directory
+        """
+        return self.video_to_wavs(video_source, (sample_rate, channels))[0]
+
+    def video_to_wavs(
+            self,
+            video_source: Union[Path, str],
+            *formats: tuple[Optional[int], Optional[int]]
+    ) -> list[Audio]:
+        """ Decodes first audio stream of video to several wav files with one ffmpeg call,
+        so source is read and decoded only once
+        :param video_source: Path to source video
+        :param formats: Pairs of sample rate and channels amount for each wav.
+            Original value is kept if None
+        :return: Audios with paths to wavs in temporary directory, in order of formats
+        """
+        video_source = resolve_path(video_source)
+        parameters: list[Union[Path, str, int]] = ['-i', video_source]
+        wavs = []
+        for sample_rate, channels in formats:
+            target_wav = self._tempDirectory_path / f"{random_string()}.wav"
+            parameters.extend(('-map', '0:a:0', '-vn', '-acodec', 'pcm_s16le'))
+            if sample_rate is not None:
+                parameters.extend(('-ar', sample_rate))
+            if channels is not None:
+                parameters.extend(('-ac', channels))
+            parameters.append(target_wav)
+            wavs.append(Audio(
+                index=0,
+                codec='pcm_s16le',
+                language=None,
+                bitrate=None,
+                source=target_wav,
+                frequency=sample_rate
+            ))
+        self._call_ffmpeg(*parameters)
+        return wavs
 
     def replace_audio_line(
             self,
@@ -431,34 +739,45 @@ class FFMpeg:
             audio_source: Union[Path, str],
             audio_line: int = 0,
             use_tempdir: bool = True,
+            target: Optional[Path] = None
     ) -> Path:
         video_source = resolve_path(video_source)
-        if not video_source.exists():
-            raise ValueError('Path is not correct')
-        if not video_source.is_file():
-            raise ValueError('Path target is not a files')
+        require_file(video_source)
 
         audio_source = resolve_path(audio_source)
-        if not audio_source.exists():
-            raise ValueError('Path is not correct')
-        if not audio_source.is_file():
-            raise ValueError('Path target is not a files')
+        require_file(audio_source)
 
-        if use_tempdir:
-            new_video_source = self._tempDirectory_path / f"{video_source.name.split('.')[0]}.mp4"
+        if target is not None:
+            new_video_source = target
+        elif use_tempdir:
+            new_video_source = self._tempDirectory_path / f"{random_string()}.mp4"
         else:
             new_video_source = video_source.parent / f"{video_source.name.split('.')[0]}_replaced.mp4"
 
-        self._call_ffmpeg(
-            f'-i {video_source} '
-            f'-i {audio_source} '
-            f'-c:v copy '
-            f'-map 0:v:0 '
-            f'-map 1:a:{audio_line} '
-            f'{new_video_source}'
-        )
+        self._mux_audio_line(video_source, audio_source, audio_line, new_video_source)
         return new_video_source
 
+    def _mux_audio_line(self, video_source: Path, audio_source: Path, audio_line: int, target: Path) -> None:
+        """ Same as replace_audio_line, but trusts its arguments: paths are already checked by caller
+        Raises ValueError if muxing failed, partly written target is removed
+        """
+        # Checked here, so file removed on failure is always the one ffmpeg started writing
+        if target.exists():
+            raise ValueError('Trying to overwrite file')
+        try:
+            self._call_ffmpeg(
+                '-i', video_source,
+                '-i', audio_source,
+                '-c:v', 'copy',
+                '-map', '0:v:0',
+                '-map', f'1:a:{audio_line}',
+                target,
+                check=True
+            )
+        except BaseException:
+            target.unlink(missing_ok=True)
+            raise
+
     def edit_video(
             self,
             video_source: Union[Path, str],
@@ -467,27 +786,49 @@ class FFMpeg:
     ):
         video_source = resolve_path(video_source)
         assert '.' in video_source.name
-        wav = self.get_wav(video_source)
+        # Source is checked once here. Wav is created by us, so it doesn't need checks at all
+        require_file(video_source)
+        wav = self.video_to_wav(video_source)
         changer(wav.source)
-        new_video = self.replace_audio_line(video_source, wav.source, use_tempdir=True)
+        # Result is muxed straight to its final folder, so it's never copied from temporary directory
         if replace:
-            video_source.unlink()
-            new_video.rename(video_source.absolute())
+            target = video_source.with_name(f'{random_string()}{video_source.suffix}')
         else:
-            name = video_source.name
-            index = name.rfind('.')
-            name = name[:index] + '_replaced' + name[index:]
-            new_video.rename(video_source.absolute().parent / name)
+            target = video_source.with_name(f'{video_source.stem}_replaced{video_source.suffix}')
+        self._mux_audio_line(video_source, wav.source, 0, target)
+        # Source is replaced only by successfully muxed result, otherwise error is already raised
+        if replace:
+            os.replace(target, video_source)
 
     def extract_wav_fragment(self, start: float, end: float, /, wav_file: Audio) -> Audio:
+        """ Cuts fragment of PCM wav file. Samples are copied directly, without ffmpeg
+        :param start: start of fragment in seconds
+        :param end: end of fragment in seconds
+        :param wav_file: PCM wav file
+        :return: Audio with path to fragment in temporary directory
+        """
         path = self._tempDirectory_path / f"{random_string()}.wav"
-        self._call_ffmpeg(' '.join([
-            f'-i {wav_file.source.absolute()}',
-            f'-ss {start}',
-            f'-t {end-start}',
-            f'{path.absolute()}'
-        ]))
-        return Audio(None, None, None, None, path, None, skip_validators=True)
+        header = wav_header(wav_file.source)
+        frame_size = header.channels * header.sample_width
+        nframes = header.data_size // frame_size
+        first = min(int(start * header.framerate), nframes)
+        last = min(int(end * header.framerate), nframes)
+        with wav_file.source.open('rb') as source:
+            source.seek(header.data_offset + first * frame_size)
+            frames = source.read(max(0, last - first) * frame_size)
+        with wave.open(str(path), 'wb') as output:
+            output.setnchannels(header.channels)
+            output.setsampwidth(header.sample_width)
+            output.setframerate(header.framerate)
+            output.writeframes(frames)
+        return Audio(
+            index=0,
+            codec='pcm_s16le',
+            language=None,
+            bitrate=None,
+            source=path,
+            frequency=header.framerate
+        )
 
     def _stt(
             self,
@@ -497,7 +838,7 @@ class FFMpeg:
             subtitle_codes: set[str],
             wav_file: Audio,
     ):
-        generator = stt_process(wav_file.source, self._tempDirectory_path)
+        generator = stt_process(wav_file.source, self.ffmpeg)
         for i in generator:
             if 'result' not in i:
                 continue
@@ -520,54 +861,91 @@ class FFMpeg:
             sentences_origin: Queue[Audio],
             audio_codes: set[str],
             subtitle_codes: set[str],
-            get_wav: Callable[[float, float], Audio]
+            get_wav: Callable[[float, float], Audio],
+            translator: Translator
     ) -> None:
-        all_codes = audio_codes.union(subtitle_codes).difference({'ru'})
-        translator = Translator()
-        if 'ru' in subtitle_codes:
+        # Computed once per run. Sorted tuple keeps order of translations same for every line
+        all_codes = tuple(sorted(audio_codes.union(subtitle_codes).difference({'ru'})))
+        write_ru = 'ru' in subtitle_codes
+        if write_ru:
             ru_subs_path = self._tempDirectory_path / f"{random_string()}.srt"
-            while ru_subs_path.exists():
-                ru_subs_path = self._tempDirectory_path / f"{random_string()}.srt"
             ru_subs_writer = subtitles_write(ru_subs_path)
             next(ru_subs_writer)
-            while (line := russian_texts.get()) is not None:
-                ru_subs_writer.send(line)
-                translated_lines: list[Line] = []
-                for code in all_codes:
-                    translated_lines.append(Line(
-                        start=line.start,
-                        end=line.end,
-                        text=translator.translate(line.text, target=code),
-                        lang=code
-                    ))
+        for lines in queue_batches(russian_texts, TRANSLATE_BATCH):
+            if write_ru:
+                ru_subs_writer.send(lines)
+            for line, translated_lines in zip(lines, translate_lines(translator, lines, all_codes)):
                 fragment = get_wav(line.start, line.end)
                 sentences_origin.put(fragment)
                 translated_texts.put(translated_lines)
-                russian_texts.task_done()
 
+        if write_ru:
             with suppress(GeneratorExit):
                 ru_subs_writer.close()
-            subtitle_info = self.get_info(ru_subs_path)[2][0]
+            # File is written by subtitles_write, so there is nothing to probe
             translated_subtitles.append(Subtitles(
-                index=subtitle_info.index,
-                codec=subtitle_info.codec,
+                index=0,
+                codec='subrip',
                 language='ru',
                 source=ru_subs_path
             ))
-        else:
-            while (line := russian_texts.get()) is not None:
-                translated_lines: list[Line] = []
-                for code in all_codes:
-                    translated_lines.append(Line(
-                        start=line.start,
-                        end=line.end,
-                        text=translator.translate(line.text, target=code),
-                        lang=code
-                    ))
-                fragment = get_wav(line.start, line.end)
-                sentences_origin.put(fragment)
-                translated_texts.put(translated_lines)
-                russian_texts.task_done()
+
+    def _tts(self, line: Line, sentence_origin: Audio, silence_amount: float) -> list[Audio]:
+        """ Generates speech for line and silence after it
+        :param line: translated line
+        :param sentence_origin: fragment of original audio with voice to clone
+        :param silence_amount: length of silence after line in seconds
+        :return: generated speech and silence
+        """
+        aud_paths = [
+            self._tempDirectory_path / f'{random_string()}.wav',
+            self._tempDirectory_path / f'{random_string()}.wav'
+        ]
+        tts_line(
+            text=line.text,
+            language=line.lang,
+            output=aud_paths[0],
+            source_wav_fragment=sentence_origin.source,
+            silence_amount=silence_amount,
+            silence_output=aud_paths[1]
+        )
+        # Both files were just written as PCM wav, so format is read from header instead of ffprobe
+        headers = [wav_header(i) for i in aud_paths]
+        return [
+            Audio(
+                index=0,
+                codec='pcm_s16le',
+                language=line.lang,
+                bitrate=header.framerate * header.channels * header.sample_width * 8 / 1000,
+                source=aud_path,
+                frequency=header.framerate
+            )
+            for aud_path, header in zip(aud_paths, headers)
+        ]
+
+    def _tts_lines(
+            self,
+            tts_pool: ThreadPoolExecutor,
+            lines: list[Line],
+            sentence_origin: Audio,
+            silence_amount: float,
+            audio_codes: frozenset[str]
+    ) -> list[Audio]:
+        """ Generates speech for translations of one sentence
+        Workers take turns on TTS model, which isn't thread-safe, while writing
+        of speech and silence for other languages goes on concurrently
+        :return: speech and silence of every line in audio_codes
+        """
+        lines = [line for line in lines if line.lang in audio_codes]
+        if not lines:
+            return []
+        # Voice is computed once here, otherwise every worker would compute it from the same sample
+        speaker_latents(sentence_origin.source)
+        speeches = [
+            tts_pool.submit(self._tts, line, sentence_origin, silence_amount)
+            for line in lines
+        ]
+        return list(chain.from_iterable(speech.result() for speech in speeches))
 
     def _translated_texts(
             self,
@@ -579,60 +957,44 @@ class FFMpeg:
             audio_codes: set[str],
             subtitle_codes: set[str]
     ) -> None:
+        audio_codes = frozenset(audio_codes)
         subs_writers: dict[str, tuple[Path, Generator]] = dict()
         for code in subtitle_codes.difference({'ru'}):
             ru_subs_path = self._tempDirectory_path / f"{random_string()}.srt"
-            while ru_subs_path.exists():
-                ru_subs_path = self._tempDirectory_path / f"{random_string()}.srt"
             ru_subs_writer = subtitles_write(ru_subs_path)
             next(ru_subs_writer)
             subs_writers[code] = (ru_subs_path, ru_subs_writer)
 
-        previous_lines = []
-        while (lines := translated_texts.get()) is not None:
-            sentence_origin = sentences_origin.get()
+        # Silence after sentence lasts until next one starts, so each sentence
+        # is spoken only when next one (or end of queue) is received
+        previous_lines: list[Line] = []
+        previous_origin: Optional[Audio] = None
+        with ThreadPoolExecutor(max_workers=max(1, len(audio_codes)), thread_name_prefix='TTS worker') as tts_pool:
+            while (lines := translated_texts.get()) is not None:
+                sentence_origin = sentences_origin.get()
+                for line in lines:
+                    writer = subs_writers.get(line.lang)
+                    if writer is not None:
+                        writer[1].send(line)
+                if previous_lines:
+                    silence = max(0.0, lines[0].start - previous_lines[0].end)
+                    translated_audio.extend(self._tts_lines(
+                        tts_pool, previous_lines, previous_origin, silence, audio_codes
+                    ))
+                sentences_origin.task_done()
+                translated_texts.task_done()
+                previous_lines, previous_origin = lines, sentence_origin
             if previous_lines:
-                difference = lines[0].start - previous_lines[0].end
-            for line in lines:
-                if line.lang in subtitle_codes:
-                    subs_writers[line.lang][1].send(line)
-            for line in previous_lines:
-                if line.lang in audio_codes:
-                    aud_paths = [
-                        self._tempDirectory_path / f'{random_string()}.wav',
-                        self._tempDirectory_path / f'{random_string()}.wav'
-                    ]
-                    tts_line(
-                        text=line.text,
-                        output=aud_paths[0],
-                        source_wav_fragment=sentence_origin.source,
-                        silence_amount=difference,
-                        silence_output=aud_paths[1]
-                    )
-                    generated_info = [
-                        self.get_info(aud_paths[0])[1][0],
-                        self.get_info(aud_paths[1])[1][0]
-                    ]
-                    for aud_path, info in zip(aud_paths, generated_info):
-                        translated_audio.append(Audio(
-                            index=0,
-                            codec=info.codec,
-                            language=line.lang,
-                            bitrate=info.bitrate,
-                            source=aud_path,
-                            frequency=info.frequency
-                        ))
-            sentences_origin.task_done()
-            translated_texts.task_done()
-            previous_lines = lines
+                translated_audio.extend(self._tts_lines(
+                    tts_pool, previous_lines, previous_origin, 0.0, audio_codes
+                ))
 
         for code, (path, gen) in subs_writers.items():
             with suppress(GeneratorExit):
                 gen.close()
-            subtitle_info = self.get_info(path)[2][0]
             translated_subtitles.append(Subtitles(
-                index=subtitle_info.index,
-                codec=subtitle_info.codec,
+                index=0,
+                codec='subrip',
                 language=code,
                 source=path
             ))
@@ -643,77 +1005,86 @@ class FFMpeg:
             self,
             source: Path,
             target: Path,
-            audio_codes: set[str],
-            subtitle_codes: set[str]
+            audio_codes: Union[set[str], frozenset[str]],
+            subtitle_codes: Union[set[str], frozenset[str]],
+            translator: Optional[Translator] = None
     ) -> None:
         assert isinstance(source, Path)
         assert isinstance(target, Path)
-        assert isinstance(audio_codes, set)
-        assert isinstance(subtitle_codes, set)
+        assert isinstance(audio_codes, (set, frozenset))
+        assert isinstance(subtitle_codes, (set, frozenset))
+        # Models are loaded here, before pipeline starts, and shared by all threads
+        if translator is None:
+            translator = Translator()
         source_info = self.get_info(source)
-        wav_file = self.aac_to_wav(source_info[1][0].source)
+        # Speaker fragments for voice cloning keep original quality, while stt gets
+        # wav in recognizer format and reads it as is. Both come from one decode of source
+        wav_file, stt_wav_file = self.video_to_wavs(source, (None, None), (STT_SAMPLE_RATE, 1))
         print(self._tempDirectory_path)
 
-        russian_texts: Queue[Optional[Line]] = Queue(maxsize=0)
-        translated_texts: Queue[Optional[list[Line]]] = Queue(maxsize=0)
-        sentences_origin: Queue[Audio] = Queue(maxsize=0)
+        # Bounded queues make faster stages wait for slower ones instead of piling up lines in memory
+        russian_texts: Queue[Optional[Line]] = Queue(maxsize=QUEUE_SIZE)
+        translated_texts: Queue[Optional[list[Line]]] = Queue(maxsize=QUEUE_SIZE)
+        sentences_origin: Queue[Audio] = Queue(maxsize=QUEUE_SIZE)
         translated_audio: list[Audio] = []
         translated_subtitles: list[Subtitles] = []
 
-        text_thread = Thread(
-            target=self._texts,
-            kwargs={
-                'russian_texts': russian_texts,
-                'translated_texts': translated_texts,
-                'translated_subtitles': translated_subtitles,
-                'sentences_origin': sentences_origin,
-                'get_wav': partial(self.extract_wav_fragment, wav_file=wav_file),
-                'audio_codes': audio_codes,
-                'subtitle_codes': subtitle_codes
-            },
-            name='Text analyzer thread'
-        )
-        text_thread.start()
-        translated_text_thread = Thread(
-            target=self._translated_texts,
-            kwargs={
-                'translated_texts': translated_texts,
-                'translated_audio': translated_audio,
-                'translated_subtitles': translated_subtitles,
-                'sentences_origin': sentences_origin,
-                'audio_codes': audio_codes,
-                'subtitle_codes': subtitle_codes
-            },
-            name='Translated text analyzer thread'
-        )
-        translated_text_thread.start()
-
-        stt_thread = Thread(
-            target=self._stt,
-            kwargs={
-                'russian_texts': russian_texts,
-                'wav_file': wav_file,
-                'audio_codes': audio_codes,
-                'subtitle_codes': subtitle_codes
-            },
-            name='STT thread'
-        )
-        stt_thread.start()
-
-        stt_thread.join()
-        russian_texts.put(None)
-        translated_texts.put(None)
-        text_thread.join()
-        translated_text_thread.join()
+        # Each stage closes its output queue, so pipeline finishes even if one of them failed.
+        # Exceptions of stages are raised here
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix='Pipeline stage') as pipeline:
+            stt_stage = pipeline.submit(
+                pipeline_stage,
+                self._stt,
+                output=russian_texts,
+                russian_texts=russian_texts,
+                wav_file=stt_wav_file,
+                audio_codes=audio_codes,
+                subtitle_codes=subtitle_codes
+            )
+            text_stage = pipeline.submit(
+                pipeline_stage,
+                self._texts,
+                producer=stt_stage,
+                inputs=(russian_texts,),
+                output=translated_texts,
+                russian_texts=russian_texts,
+                translated_texts=translated_texts,
+                translated_subtitles=translated_subtitles,
+                sentences_origin=sentences_origin,
+                get_wav=partial(self.extract_wav_fragment, wav_file=wav_file),
+                translator=translator,
+                audio_codes=audio_codes,
+                subtitle_codes=subtitle_codes
+            )
+            translated_text_stage = pipeline.submit(
+                pipeline_stage,
+                self._translated_texts,
+                producer=text_stage,
+                inputs=(translated_texts, sentences_origin),
+                translated_texts=translated_texts,
+                translated_audio=translated_audio,
+                translated_subtitles=translated_subtitles,
+                sentences_origin=sentences_origin,
+                audio_codes=audio_codes,
+                subtitle_codes=subtitle_codes
+            )
+            for stage in (stt_stage, text_stage, translated_text_stage):
+                stage.result()
 
-        combined_sounds = AudioSegment.empty()
         mc = MediaContainer()
-        mc.add(source_info[0][0])  # Original audio
+        mc.add(source_info[0][0])  # Original video
+        # One audio track per language, all of them muxed by a single build_mc call
+        audio_sources: dict[str, list[Path]] = dict()
         for audio in translated_audio:
-            combined_sounds += AudioSegment.from_wav(str(audio.source.absolute()))
-        custom_path = self._tempDirectory_path / f"{random_string()}.wav"
-        combined_sounds.export(str(custom_path.absolute()), codec='wav')
-        mc.add(Audio(None, None, None, None, custom_path, None, skip_validators=True))
+            audio_sources.setdefault(audio.language, []).append(audio.source)
+        for code, sources in audio_sources.items():
+            custom_path = self._tempDirectory_path / f"{random_string()}.wav"
+            if not concat_wav(sources, custom_path):
+                combined_sounds = AudioSegment.empty()
+                for source in sources:
+                    combined_sounds += AudioSegment.from_wav(str(source.absolute()))
+                combined_sounds.export(str(custom_path.absolute()), format='wav')
+            mc.add(Audio(index=0, codec=None, language=code, bitrate=None, source=custom_path, frequency=None))
         for subtitle in translated_subtitles:
             mc.add(subtitle)
         print(translated_audio, translated_subtitles)
@@ -1,8 +1,10 @@
 from typing import Union
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from logging import warning
 
-from argostranslate.translate import get_translation_from_codes, ITranslation
+from argostranslate.translate import get_installed_languages, ITranslation
 from argostranslate.package import get_installed_packages
 
 
@@ -12,6 +14,9 @@ __all__ = (
 )
 
 
+TRANSLATION_CACHE_SIZE = 10_000
+
+
 class NoSuchLanguage(Exception):
     pass
 
@@ -21,7 +26,7 @@ class Translator:
     Supported direct translation from Russian to English
     Other supported only as transit via English
     """
-    __slots__ = ('_direct_map', '_transit_map')
+    __slots__ = ('_direct_map', '_transit_map', '_pool')
     __instance = None
 
     def __new__(cls, *args, **kwargs):
@@ -30,15 +35,29 @@ class Translator:
         return cls.__instance
 
     def __init__(self):
+        # __init__ runs on every Translator() call, even when __new__ returned
+        # existing instance. Packages should be loaded only once
+        if hasattr(self, '_direct_map'):
+            return
         self._direct_map: dict[str, ITranslation] = dict()
         self._transit_map: dict[str, ITranslation] = dict()
+        # Languages are loaded once. get_translation_from_codes loads all of them on every call
+        languages = {language.code: language for language in get_installed_languages()}
         for package in get_installed_packages():
-            transl_package = get_translation_from_codes(package.from_code, package.to_code)
+            transl_package = languages[package.from_code].get_translation(languages[package.to_code])
             if package.from_code == 'ru':
                 self._direct_map[package.to_code] = transl_package
             elif package.from_code == 'en':
                 self._transit_map[package.to_code] = transl_package
-        self._transit_map.pop('ru')
+        self._transit_map.pop('ru', None)
+        # Transit languages are reachable only through Russian-English model
+        if 'en' not in self._direct_map:
+            self._transit_map.clear()
+        # Workers live as long as singleton, so batches don't start new threads each time
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, len(self._direct_map) + len(self._transit_map)),
+            thread_name_prefix='Translator worker'
+        )
 
     def __call__(self, values: Union[str, Iterable[str]], target: str) -> Union[str, list[str]]:
         """ High-level translation
@@ -62,10 +81,10 @@ class Translator:
         Assumes that code of target language is correct
         """
         if target in self._direct_map:
-            return self._direct_map[target].translate(string)
+            return self._translate_cached('ru', target, string)
         elif target in self._transit_map:
-            en_string = self._direct_map['en'].translate(string)
-            return self._transit_map[target].translate(en_string)
+            en_string = self._translate_cached('ru', 'en', string)
+            return self._translate_cached('en', target, en_string)
         else:
             raise ValueError('No such language')
 
@@ -78,10 +97,42 @@ class Translator:
         Assumes that code of target language is correct
         Assumes that length of input and output list equals
         """
-        output = []
-        for i in strings:
-            output.append(self.translate(i, target))
-        return output
+        strings = list(strings)
+        # Every distinct string is translated once, duplicates share result
+        translations = {i: self.translate(i, target) for i in dict.fromkeys(strings)}
+        return [translations[i] for i in strings]
+
+    def translate_from_english(self, strings: Iterable[str], target: str) -> list[str]:
+        """ Translates list of already translated to English strings
+        :param strings: List of English strings
+        :param target: Code of target language, that is translated via English
+        :return: Translated list of strings
+        """
+        if target not in self._transit_map:
+            raise ValueError('No such language')
+        return [self._translate_cached('en', target, i) for i in strings]
+
+    def translate_many(self, strings: Sequence[str], targets: Iterable[str]) -> dict[str, list[str]]:
+        """ Translates list of strings to several languages at once
+        Each target language uses its own model, so targets are translated in parallel.
+        Strings are translated to English only once for all transit languages
+        :param strings: List of strings that needs to be translated
+        :param targets: Codes of target languages
+        :return: Dictionary with target codes as keys and translated lists of strings as values
+        """
+        targets = list(targets)
+        results: dict[str, Future] = {
+            code: self._pool.submit(self.translate_list, strings, code)
+            for code in targets
+            if code in self._direct_map
+        }
+        transit = [code for code in targets if code not in results]
+        if transit:
+            english = results.get('en') or self._pool.submit(self.translate_list, strings, 'en')
+            english = english.result()
+            for code in transit:
+                results[code] = self._pool.submit(self.translate_from_english, english, code)
+        return {code: results[code].result() for code in targets}
 
     @classmethod
     def init(cls) -> None:
@@ -90,5 +141,24 @@ class Translator:
         else:
             warning('Trying to init() class Translator while instance already exists')
 
+    @lru_cache(maxsize=TRANSLATION_CACHE_SIZE)
+    def _translate_cached(self, source: str, target: str, string: str) -> str:
+        """ Translation by single model. Subtitles often repeat short phrases,
+        and model inference is much more expensive than cache lookup
+        :param source: 'ru' for direct models, 'en' for transit models
+        :param target: Code of target language
+        :param string: String that needs to be translated
+        :return: Translated string
+        """
+        models = self._direct_map if source == 'ru' else self._transit_map
+        return models[target].translate(string)
+
     def available_codes(self) -> list[str]:
-        return sorted([*self._direct_map.keys(), *self._transit_map.keys()])
+        return list(self._available_codes())
+
+    @lru_cache(maxsize=1)
+    def _available_codes(self) -> tuple[str, ...]:
+        """ Codes can't change after __init__, so they are computed once.
+        Tuple is cached to prevent callers from mutating cached value
+        """
+        return tuple(sorted([*self._direct_map.keys(), *self._transit_map.keys()]))
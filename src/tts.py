@@ -1,12 +1,30 @@
+from functools import lru_cache
 from pathlib import Path
+from threading import Lock
 import os
 
 import torch
 from TTS.api import TTS
 from pydub import AudioSegment
 
+from .wav import concat_wav
+
 device = "cuda" if torch.cuda.is_available() else "cpu"
 tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(device)
+# XTTS keeps state of current call on the model (GPT stores prefix embedding of text and speaker),
+# so model is used by one thread at a time. Writing of files isn't locked
+_model_lock = Lock()
+
+
+@lru_cache(maxsize=8)
+def speaker_latents(speaker_wav: Path):
+    """ Voice of speaker, computed by model from sample.
+    Cached, because the same sample is used for every language of sentence
+    :param speaker_wav: path to voice sample
+    :return: gpt conditioning latent and speaker embedding
+    """
+    with _model_lock, torch.inference_mode():
+        return tts.synthesizer.tts_model.get_conditioning_latents(audio_path=[str(speaker_wav.absolute())])
 
 
 def combine_sentences(sentences):
@@ -18,7 +36,6 @@ def combine_sentences(sentences):
     combined_text = sentences[0]['text']
     combined_start = sentences[0]['start']
     combined_end = sentences[0]['end']
-    total_dur = abs(combined_end-combined_start)
 
     # Объединяем остальные предложения
     for i in range(1, len(sentences)):
@@ -29,8 +46,6 @@ def combine_sentences(sentences):
         if abs(combined_end-start) < 5:
             combined_text += ' ' + sentences[i]['text']  # Объединяем текст
             combined_end = end  # Обновляем конец объединенного предложения
-            total_dur += abs(combined_end-start)
-            total_dur += abs(end - start)
         else:
             # Создаем пустой wav файл в промежутке между предложениями
             duration = start - combined_end
@@ -38,22 +53,23 @@ def combine_sentences(sentences):
             count+=1
 
             # Создаем wav файла для объединенного предложения
-            create_combined_wav(combined_text, total_dur, count)
+            # Длительность - от начала первого до конца последнего предложения
+            create_combined_wav(combined_text, combined_end - combined_start, count)
             count+=1
 
             # Обновляем начало и конец следующего объединенного предложения
             combined_text = sentences[i]['text']
             combined_start = start
             combined_end = end
-            total_dur = 0
 
     # Создаем wav файла для последнего объединенного предложения
-    create_combined_wav(combined_text, total_dur, count)
+    create_combined_wav(combined_text, combined_end - combined_start, count)
 
 
 def create_silent_wav(duration, count, path: Path):
     # Создаем пустой wav файл заданной длительности
-    silence = AudioSegment.silent(duration * 1000)
+    # Same rate as generated speech, so tracks can be concatenated without resampling
+    silence = AudioSegment.silent(duration * 1000, frame_rate=tts.synthesizer.output_sample_rate)
     silence.export(str(path.absolute()), format='wav')
 
 
@@ -68,35 +84,44 @@ def create_combined_wav(text, total_dur, count):
 
 
 def final():
-    combined_sounds = AudioSegment.empty()
-
     # Укажите путь к папке, содержащей wav файлы
-    folder_path = 'back/'
+    folder_path = Path('back/')
 
-    # Обходите все файлы в папке
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".wav"):
-            # Откройте каждый файл и добавьте его звук в общий объект AudioSegment
-            sound = AudioSegment.from_wav(os.path.join(folder_path, filename))
-            combined_sounds += sound
+    # Файлы пронумерованы в порядке создания, os.listdir возвращает их в произвольном порядке
+    sources = sorted(
+        (folder_path / filename for filename in os.listdir(folder_path) if filename.endswith('.wav')),
+        key=lambda path: int(path.stem)
+    )
 
-    # Сохраните общий звук в новом wav файле
+    # Кадры копируются в общий файл без декодирования
+    if concat_wav(sources, Path('combined.wav')):
+        return
+    # Форматы файлов различаются, поэтому звук объединяется через AudioSegment
+    combined_sounds = AudioSegment.empty()
+    for source in sources:
+        combined_sounds += AudioSegment.from_wav(str(source))
     combined_sounds.export("combined.wav", format="wav")
 
 
 def tts_line(
         text: str,
+        language: str,
         output: Path,
         source_wav_fragment: Path,
         silence_amount: float,
         silence_output: Path
 ) -> None:
-    tts.tts_to_file(
-        text=text,
-        speaker_wav=str(source_wav_fragment.absolute()),
-        file_path=str(output.absolute()),
-        language='ru'
-    )
+    gpt_cond_latent, speaker_embedding = speaker_latents(source_wav_fragment)
+    with _model_lock, torch.inference_mode():
+        wav = tts.synthesizer.tts_model.inference(
+            text,
+            language,
+            gpt_cond_latent,
+            speaker_embedding,
+            # Long lines are over XTTS per language characters limit, they're synthesized by sentences
+            enable_text_splitting=True
+        )['wav']
+    tts.synthesizer.save_wav(wav, str(output.absolute()))
     create_silent_wav(silence_amount, None, silence_output)
 
 
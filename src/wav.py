@@ -0,0 +1,83 @@
+from functools import lru_cache
+from pathlib import Path
+from struct import unpack, unpack_from
+from typing import Iterable, NamedTuple
+import wave
+
+
+__all__ = ('WavHeader', 'wav_header', 'concat_wav')
+
+WAV_COPY_FRAMES = 1 << 18
+
+
+class WavHeader(NamedTuple):
+    channels: int
+    sample_width: int
+    framerate: int
+    data_offset: int
+    data_size: int
+    audio_format: int  # 1 for integer PCM
+
+
+def wav_header(path: Path) -> WavHeader:
+    """ Parses header of PCM wav file with struct. Result is cached,
+    because fragments are cut from the same file many times.
+    Cache is keyed on modification time and size, so rewritten file is parsed again
+    :param path: path to wav file
+    :return: format of samples and position of data chunk
+    """
+    stat = path.stat()
+    return _wav_header(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=16)
+def _wav_header(path: Path, mtime_ns: int, file_size: int) -> WavHeader:
+    with path.open('rb') as f:
+        header = f.read(12)
+        if len(header) < 12:
+            raise ValueError(f'{path.name} is not a wav file')
+        riff, _, wave_id = unpack('<4sI4s', header)
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f'{path.name} is not a wav file')
+        channels = sample_width = framerate = audio_format = None
+        while len(chunk_header := f.read(8)) == 8:
+            chunk_id, size = unpack('<4sI', chunk_header)
+            if chunk_id == b'data':
+                if channels is None:
+                    raise ValueError(f'{path.name} has no fmt chunk before data')
+                data_offset = f.tell()
+                data_size = min(size, file_size - data_offset)
+                return WavHeader(channels, sample_width, framerate, data_offset, data_size, audio_format)
+            chunk = f.read(size + size % 2)
+            if chunk_id == b'fmt ':
+                if len(chunk) < 16:
+                    raise ValueError(f'{path.name} has broken fmt chunk')
+                audio_format, channels, framerate, _, _, bits = unpack_from('<HHIIHH', chunk)
+                sample_width = bits // 8
+    raise ValueError(f'{path.name} has no data chunk')
+
+
+def concat_wav(sources: Iterable[Path], target: Path) -> bool:
+    """ Concatenates wav files by copying their frames, without decoding
+    and without holding whole files in memory
+    :param sources: wav files to concatenate
+    :param target: path to resulting wav file
+    :return: False, if sources have different formats. Nothing is written in this case
+    """
+    sources = list(sources)
+    if not sources:
+        return False
+    params = set()
+    for source in sources:
+        with wave.open(str(source), 'rb') as wav:
+            params.add((wav.getnchannels(), wav.getsampwidth(), wav.getframerate(), wav.getcomptype()))
+    if len(params) != 1:
+        return False
+    with wave.open(str(target), 'wb') as output:
+        with wave.open(str(sources[0]), 'rb') as wav:
+            output.setparams(wav.getparams())
+        for source in sources:
+            with wave.open(str(source), 'rb') as wav:
+                while data := wav.readframes(WAV_COPY_FRAMES):
+                    output.writeframesraw(data)
+    return True